@@ -23,6 +23,8 @@ External Services:
   - Payment processing
   - Checkout sessions
   - Webhooks
+  - Calls run over a pooled keep-alive session; payment
+    verification runs on a bounded background pool
 - Pterodactyl API:
   - User verification
   - Resource allocation
@@ -48,9 +50,14 @@ Payment Flow:
 5. Transaction logged
 """
 
-from flask import Blueprint, request, render_template, session, flash, redirect, url_for
+from flask import Blueprint, request, render_template, session, flash, redirect, url_for, current_app
 import sys
+import threading
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from concurrent.futures import ThreadPoolExecutor
 from threadedreturn import ThreadWithReturnValue
+from cacheext import cache
 sys.path.append("..")
 from managers.authentication import login_required
 from managers.user_manager import get_ptero_id, get_id
@@ -62,8 +69,69 @@ from products import products
 import stripe
 
 stripe.api_key = STRIPE_SECRET_KEY
+
+# Workers in the verification pool. The HTTPS connection pool below is sized
+# against this so every concurrent verification (plus the checkouts running on
+# request threads) picks up a warm keep-alive connection instead of opening a
+# new one - the closest requests/urllib3 gets to multiplexing, since the stack
+# has no HTTP/2 support.
+_VERIFY_WORKERS = 8
+
+# Shared HTTP session for all Stripe API calls. Pooled keep-alive connections
+# avoid a fresh TCP + TLS handshake on every checkout/verification, and
+# transient gateway errors are retried with a small backoff.
+_stripe_session = requests.Session()
+_stripe_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=_VERIFY_WORKERS * 2,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+# Explicit (connect, read) timeout so a stalled gateway can't pin a worker,
+# plus SDK-level retries for dropped connections. Stripe requests are
+# idempotent so the retries are safe.
+stripe.default_http_client = stripe.http_client.RequestsClient(timeout=(3.05, 10), session=_stripe_session)
+stripe.max_network_retries = 2
+
 store = Blueprint('store', __name__)
 
+# Bounded pool for payment verification. The success route hands the gateway
+# round-trip and credit allocation to this pool so WSGI workers are not pinned
+# on outbound HTTPS during payment spikes.
+_verify_pool = ThreadPoolExecutor(max_workers=_VERIFY_WORKERS, thread_name_prefix="stripe-verify")
+
+# Serializes the processed/pending checks below so two callbacks for the same
+# checkout session can't both queue a verification.
+_dedupe_lock = threading.Lock()
+
+# O(1) product lookups built once at import: products keyed by their Stripe
+# price link, plus the purchasable subset shown on the store page.
+PRODUCTS_BY_PRICE_LINK = {p['price_link']: p for p in products if p['price_link'] is not None}
+STORE_PRODUCTS = list(PRODUCTS_BY_PRICE_LINK.values())
+
+# Credit amounts per price link, converted to int once at import so the
+# crediting path does no per-payment arithmetic or product access.
+CREDITS_BY_PRICE_LINK = {link: int(p['price']) for link, p in PRODUCTS_BY_PRICE_LINK.items()}
+
+# The index redirect target takes no per-request parameters, so the url_for
+# result is computed once under the first request and reused by every store
+# route instead of rebuilding the rule each time.
+_index_url = None
+
+def _user_index_url():
+    global _index_url
+    if _index_url is None:
+        _index_url = url_for("user.index")
+    return _index_url
+
+# Static checkout parameters, built once at import so each request only has to
+# fill in the per-user fields.
+CHECKOUT_PAYMENT_METHOD_TYPES = ['card', 'cashapp', "wechat_pay", "alipay"]
+CHECKOUT_PAYMENT_METHOD_OPTIONS = {
+    "wechat_pay": {
+        "client": "web"
+    }
+}
+
 @store.route("/")
 @login_required
 def storepage():
@@ -100,11 +168,16 @@ def storepage():
         ptero_id = get_ptero_id(session['email'])
         session['pterodactyl_id'] = ptero_id
 
-    products_local = list(products)
-    for product in products_local:
-        if product['price_link'] is None:
-            products_local.remove(product)
-    return render_template("store.html", products=products_local)
+    # The catalog is identical for every user, so the rendered page is cached.
+    # Requests with pending flash messages skip the cache so the messages are
+    # rendered (and consumed) normally.
+    if '_flashes' in session:
+        return render_template("store.html", products=STORE_PRODUCTS)
+    page = cache.get("store_page_html")
+    if page is None:
+        page = render_template("store.html", products=STORE_PRODUCTS)
+        cache.set("store_page_html", page, timeout=300)
+    return page
 
 
 @store.route('/checkout/<price_link>', methods=['POST', 'GET'])
@@ -142,20 +215,23 @@ def create_checkout_session(price_link: str):
         - create_session(): Stripe helper
         - store_session(): Caches info
     """
-    if 'pterodactyl_id' in session:
-        pass
-    else:
-        ptero_id = get_ptero_id(session['email'])
-        session['pterodactyl_id'] = ptero_id
+    # Overlap the panel-ID lookup with the gateway round-trip: creating the
+    # checkout session only needs the user's email, so the database query runs
+    # on a ThreadWithReturnValue while the Stripe call is in flight.
+    ptero_thread = None
+    if 'pterodactyl_id' not in session:
+        ptero_thread = ThreadWithReturnValue(target=get_ptero_id, args=(session['email'],))
+        ptero_thread.start()
+
+    if price_link not in PRODUCTS_BY_PRICE_LINK:
+        if ptero_thread is not None:
+            session['pterodactyl_id'] = ptero_thread.join()
+        flash("not valid product")
+        return redirect(_user_index_url())
 
     check_session = stripe.checkout.Session.create(
-        payment_method_types=['card', 'cashapp', "wechat_pay", "alipay"],
-        payment_method_options={
-        "wechat_pay": {
-          "client": "web"
-        
-            }
-        },
+        payment_method_types=CHECKOUT_PAYMENT_METHOD_TYPES,
+        payment_method_options=CHECKOUT_PAYMENT_METHOD_OPTIONS,
         allow_promotion_codes=True,
         line_items=[{
             'price': price_link,
@@ -166,96 +242,161 @@ def create_checkout_session(price_link: str):
         cancel_url=YOUR_CANCEL_URL,
         customer_email=str(session['email']).strip().lower()
     )
+    if ptero_thread is not None:
+        session['pterodactyl_id'] = ptero_thread.join()
+    # Server-side record of which product this checkout session pays for; the
+    # success path resolves the credit amount from this map by session ID
+    # instead of round-tripping the value through the user session.
+    cache.set(f"payment_price_link_{check_session['id']}", price_link, timeout=86400)
     session['price_link'] = price_link
     session['pay_id'] = check_session['id']
     return redirect(check_session['url'])
 
 
+def _verify_and_credit(pay_id: str, price_link: str, session_email: str, app):
+    """
+    Verify a Stripe checkout session and allocate credits.
+
+    Runs on the verification pool so the WSGI worker that handled the
+    callback is freed immediately. The outcome is written to the cache under
+    payment_status_<pay_id> for the status endpoint to report.
+
+    Args:
+        pay_id: Stripe checkout session ID
+        price_link: Product price ID stored at checkout
+        session_email: Normalized email of the logged-in user
+        app: Flask app for the application context
+
+    Returns:
+        None
+    """
+    status_key = f"payment_status_{pay_id}"
+    with app.app_context():
+        try:
+            check_session = stripe.checkout.Session.retrieve(pay_id)
+            if check_session is None:
+                cache.set(status_key, "invalid", timeout=3600)
+                return
+
+            # Ensure the Stripe session belongs to the logged-in user
+            customer_email = str(check_session.get('customer_email', '')).strip().lower()
+            if not session_email or session_email != customer_email:
+                webhook_log(f"Payment session email mismatch for pay_id {pay_id}: session_email={session_email}, customer_email={customer_email}", database_log=True)
+                cache.set(status_key, "invalid", timeout=3600)
+                return
+
+            # Validate the response shape before acting on it: a session
+            # missing either status field is treated as malformed rather than
+            # being allowed to KeyError into the generic handler below.
+            payment_status = check_session.get('payment_status')
+            checkout_status = check_session.get('status')
+            if payment_status is None or checkout_status is None:
+                webhook_log(f"Malformed gateway response for pay_id {pay_id}: missing payment_status/status", 2, database_log=True)
+                cache.set(status_key, "failed", timeout=3600)
+                return
+
+            if payment_status == 'paid':
+                credits_to_add = CREDITS_BY_PRICE_LINK.get(price_link)
+                if credits_to_add is None:
+                    cache.set(status_key, "failed", timeout=3600)
+                    return
+                add_credits(customer_email, credits_to_add)
+                # Mark the session as processed for a day so repeated
+                # callbacks can't grant credits twice.
+                cache.set(f"payment_processed_{pay_id}", True, timeout=86400)
+                webhook_log(f"**NEW PAYMENT ALERT**: User with email: {customer_email} bought {credits_to_add} credits.", database_log=True)
+                cache.set(status_key, "credited", timeout=3600)
+            elif checkout_status == 'expired':
+                cache.set(status_key, "expired", timeout=3600)
+            else:
+                cache.set(status_key, "failed", timeout=3600)
+        except Exception as e:
+            webhook_log(f"Error verifying payment {pay_id}: {str(e)}", 2, database_log=True)
+            cache.set(status_key, "failed", timeout=3600)
+
+
 @store.route('/success', methods=['GET'])
 @login_required
 def success():
     """
     Handle successful payment callback from Stripe.
-    
-    Templates:
-        - success.html: Confirmation page
-        
+
     API Calls:
-        - Stripe: Verify payment
-        
+        - Stripe: Verify payment (on the verification pool)
+
     Database Queries:
-        - Update user credits
-        - Log transaction
-        
+        - Update user credits (background)
+        - Log transaction (background)
+
     Process:
         1. Verify session data
-        2. Check payment status
-        3. Calculate credit amount
-        4. Update user balance
-        5. Clear session data
-        6. Log transaction
-        
+        2. Clear session payment identifiers
+        3. Queue verification on the pool
+        4. Redirect immediately
+
     Session Requirements:
         - pay_id: Checkout session ID
         - price_link: Product price ID
-        
+
     Returns:
-        template: success.html with:
-            - amount: Credits added
-            - balance: New total
-            - transaction: Payment details
-            
+        redirect: To the index page while verification completes;
+        /success/status/<pay_id> reports the outcome
+
     Related Functions:
-        - verify_payment(): Checks status
+        - _verify_and_credit(): Verifies and credits in the background
         - add_credits(): Updates balance
-        - log_payment(): Records transaction
     """
     try:
         pay_id = session['pay_id']
     except KeyError:
         flash("not valid payment")
-        return redirect(url_for("user.index"))
-        #return url_for('index')
-    check_session = stripe.checkout.Session.retrieve(pay_id)
-    if check_session is None:
-        flash("not valid payment")
-        return redirect(url_for("user.index"))
+        return redirect(_user_index_url())
         #return url_for('index')
-
-    # Ensure the Stripe session belongs to the logged-in user
+    # Resolve the product server-side by checkout session ID; the copy in the
+    # user session is only a fallback for checkouts started before the map
+    # entry existed.
+    price_link = cache.get(f"payment_price_link_{pay_id}") or session.get('price_link')
     session_email = str(session.get('email', '')).strip().lower()
-    customer_email = str(check_session.get('customer_email', '')).strip().lower()
-    if not session_email or session_email != customer_email:
-        webhook_log(f"Payment session email mismatch for pay_id {pay_id}: session_email={session_email}, customer_email={customer_email}", database_log=True)
-        flash("not valid payment")
-        return redirect(url_for("user.index"))
-
-    if check_session['payment_status'] == 'paid':
-        print(check_session)
-        credits_to_add = None
-        for product in products:
-            if product['price_link'] == session['price_link']:
-                credits_to_add = product['price']
-                break
-        if credits_to_add is None:
-            flash("Failed please open a ticket")
-            return redirect(url_for("user.index"))
-            #return url_for('index')
-        add_credits(check_session['customer_email'], credits_to_add)
-        webhook_log(f"**NEW PAYMENT ALERT**: User with email: {check_session['customer_email']} bought {credits_to_add} credits.", database_log=True)
-        # Clear session payment identifiers so refresh can't double-credit
-        session.pop('pay_id', None)
-        session.pop('price_link', None)
-        flash("Success")
-        return redirect(url_for("user.index"))
-        #return url_for('index')
 
-    elif check_session['status'] == 'expired':
-        session.pop('pay_id', None)
-        session.pop('price_link', None)
-        flash("payment link expired")
-        return redirect(url_for("user.index"))
-        #return url_for('index')
+    # Clear session payment identifiers so a refresh can't queue a second
+    # verification; the background job keeps its own copies.
+    session.pop('pay_id', None)
+    session.pop('price_link', None)
+
+    # Dedupe before touching the gateway: a replayed callback for an already
+    # credited or in-flight session is answered locally.
+    with _dedupe_lock:
+        if cache.get(f"payment_processed_{pay_id}"):
+            flash("Payment already credited")
+            return redirect(_user_index_url())
+        if cache.get(f"payment_status_{pay_id}") == "pending":
+            flash("Payment verification already in progress")
+            return redirect(_user_index_url())
+        cache.set(f"payment_status_{pay_id}", "pending", timeout=3600)
+
+    _verify_pool.submit(_verify_and_credit, pay_id, price_link, session_email, current_app._get_current_object())
+
+    flash("Payment received - your credits will be applied in a few seconds.")
+    return redirect(_user_index_url())
+
+
+@store.route('/success/status/<pay_id>', methods=['GET'])
+@login_required
+def payment_status(pay_id: str):
+    """
+    Report the outcome of a queued payment verification.
+
+    Args:
+        pay_id: Stripe checkout session ID
+
+    Returns:
+        dict: {"status": pending|credited|invalid|expired|failed|unknown}
+
+    Related Functions:
+        - _verify_and_credit(): Writes the status being reported
+    """
+    status = cache.get(f"payment_status_{pay_id}")
+    return {"status": status if status else "unknown"}
 
 
 @store.route('/cancel', methods=['GET'])
@@ -285,4 +426,4 @@ def cancel():
         - log_cancel(): Records event
     """
     #return render_template('cancel.html')
-    return redirect(url_for("user.index"))
+    return redirect(_user_index_url())
@@ -58,6 +58,7 @@ app.config.update(
     MAX_CONTENT_LENGTH=10 * 1024 * 1024,  # 10 MB
     SESSION_PERMANENT=True,
     SESSION_TYPE="filesystem",
+    SESSION_REFRESH_EACH_REQUEST=False,  # only resend the cookie / rewrite the session file when the session changes
     PERMANENT_SESSION_LIFETIME=datetime.timedelta(days=31),  # Set session timeout to 7 days
     SECRET_KEY=SECRET_KEY,
     SCHEDULER_API_ENABLED=True,
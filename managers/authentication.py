@@ -14,7 +14,8 @@ from threadedreturn import ThreadWithReturnValue
 import bcrypt
 import requests
 import threading
-from config import PTERODACTYL_URL, PTERODACTYL_ADMIN_KEY
+import time
+from config import PTERODACTYL_URL
 from managers.database_manager import DatabaseManager
 from .logging import webhook_log
 from .user_manager import update_ip, update_last_seen
@@ -25,22 +26,24 @@ from managers.email_manager import send_email
 from security import safe_requests
 
 
-# API authentication headers
-HEADERS = {
-    "Authorization": f"Bearer {PTERODACTYL_ADMIN_KEY}",
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-}
+# API authentication headers (shared template built once in managers.utils)
+from .utils import HEADERS
+
+# Seconds between last-seen writes for a session; login_required skips the
+# database write when the session was synced more recently than this.
+LAST_SEEN_SYNC_INTERVAL = 60
 
 def login_required(f):
     """
     Decorator that checks if a user is logged in.
     Redirects to login page if not logged in and passes the original URL
     as a query parameter for redirect after successful login.
-    
+    The last-seen timestamp is only written to the database once per
+    LAST_SEEN_SYNC_INTERVAL per session.
+
     Args:
         f: Function to decorate
-        
+
     Returns:
         Function: Decorated function
     """
@@ -50,9 +53,15 @@ def login_required(f):
             # Only pass the path portion of the URL for redirection after login
             next_url = request.path
             return redirect(url_for('user.login_user', next=next_url))
-        update_last_seen(session['email'])
+        # Throttle the last-seen write so every authenticated request doesn't
+        # cost a database round trip
+        now = time.time()
+        last_sync = session.get('last_seen_sync')
+        if last_sync is None or now - last_sync > LAST_SEEN_SYNC_INTERVAL:
+            update_last_seen(session['email'])
+            session['last_seen_sync'] = now
         return f(*args, **kwargs)
-        
+
     return decorated_function
 
 def admin_required(f):
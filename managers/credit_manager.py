@@ -15,7 +15,7 @@ to manage the credit system across the platform.
 import threading
 from threadedreturn import ThreadWithReturnValue
 from managers.database_manager import DatabaseManager
-from config import PTERODACTYL_URL, PTERODACTYL_ADMIN_KEY
+from config import PTERODACTYL_URL
 from products import products
 from .logging import webhook_log
 from .email_manager import send_email
@@ -25,49 +25,42 @@ from security import safe_requests
 from flask import current_app
 import datetime
 
-# API authentication headers
-HEADERS = {
-    "Authorization": f"Bearer {PTERODACTYL_ADMIN_KEY}",
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-}
+# API authentication headers (shared template built once in managers.utils)
+from .utils import HEADERS
+
+# Products keyed by memory limit, built once at import so convert_to_product
+# resolves exact matches with a single hash lookup.
+PRODUCTS_BY_MEMORY = {p['limits']['memory']: p for p in products}
 
 def add_credits(email: str, amount: int, set_client: bool = True):
     """
     Adds credits to a user's account.
     
     Process:
-    1. Gets current credits from database
-    2. Adds specified amount
-    3. Updates database
-    4. Optionally sets user role to 'client'
-    
+    1. Atomically increments credits (and optionally sets role to 'client')
+       in a single statement
+    2. Reads back the new balance for the log entry
+
     Args:
         email: User's email
         amount: Number of credits to add
         set_client: Whether to set user role to 'client'
-    
+
     Returns:
         None
     """
-    # Get current credits
-    query = "SELECT credits FROM users WHERE email = %s"
-    result = DatabaseManager.execute_query(query, (email,))
-    
+    # Single write round trip: the atomic increment replaces the previous
+    # read-modify-write across three queries and can't lose concurrent updates
+    if set_client:
+        update_query = "UPDATE users SET credits = credits + %s, role = 'client' WHERE email = %s"
+    else:
+        update_query = "UPDATE users SET credits = credits + %s WHERE email = %s"
+    DatabaseManager.execute_query(update_query, (float(amount), email))
+
+    # Read back the new balance for the log entry
+    result = DatabaseManager.execute_query("SELECT credits FROM users WHERE email = %s", (email,))
     if result:
-        current_credits = float(result[0])
-        new_credits = current_credits + amount
-        
-        # Update credits
-        update_query = "UPDATE users SET credits = %s WHERE email = %s"
-        DatabaseManager.execute_query(update_query, (float(new_credits), email))
-        
-        # Optionally set role to client
-        if set_client:
-            role_query = "UPDATE users SET role = 'client' WHERE email = %s"
-            DatabaseManager.execute_query(role_query, (email,))
-            
-        webhook_log(f"Added {amount} credits to {email}. New balance: {new_credits}", database_log=True)
+        webhook_log(f"Added {amount} credits to {email}. New balance: {float(result[0])}", database_log=True)
 
 def remove_credits(email: str, amount: float):
     """
@@ -134,12 +127,12 @@ def convert_to_product(data):
         dict: Product information
     """
     memory = data['attributes']['limits']['memory']
-    
+
     # Find matching product based on memory
-    for product in products:
-        if product['limits']['memory'] == memory:
-            return product
-            
+    product = PRODUCTS_BY_MEMORY.get(memory)
+    if product is not None:
+        return product
+
     # If no exact match, find closest match
     closest_product = min(products, key=lambda p: abs(p['limits']['memory'] - memory))
     return closest_product
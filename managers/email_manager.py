@@ -13,7 +13,6 @@ Functions in this module interact with Flask-Mail to send emails to users.
 
 import threading
 import secrets
-import string
 from flask_mail import Mail, Message
 from flask import url_for, current_app
 import smtplib
@@ -53,9 +52,8 @@ def generate_verification_token():
     Returns:
         str: Verification token
     """
-    # Generate a secure random token
-    token = ''.join(secrets.SystemRandom().choices(string.ascii_letters + string.digits, k=64))
-    return token
+    # Generate a secure random token in a single call
+    return secrets.token_urlsafe(48)
 
 def send_verification_email(email, verification_token, inner_app):
     """
@@ -92,9 +90,8 @@ def generate_reset_token():
     Returns:
         str: Reset token
     """
-    # Generate a secure random token
-    token = ''.join(secrets.SystemRandom().choices(string.ascii_letters + string.digits, k=64))
-    return token
+    # Generate a secure random token in a single call
+    return secrets.token_urlsafe(48)
 
 def send_reset_email(email: str, reset_token: str, inner_app):
     """
@@ -63,34 +63,41 @@ def webhook_log(embed_message: str, status: int = -1, non_embed_message: str = N
     if non_embed_message:
         payload["content"] = non_embed_message
     
-    # Log to activity_logs table
-    log_content = json.dumps({
-        "status": status_info["title"],
-        "message": embed_message,
-        "non_embed_message": non_embed_message,
-        "is_ticket": is_ticket,
-        "timestamp": datetime.datetime.now().isoformat()
-    })
-    
+    # Serialize the activity-log payload up front; the JSON is only built when
+    # the log actually goes to the database
+    log_content = None
     if database_log:
-        try:
-            # Insert into activity_logs table
-            query = "INSERT INTO activity_logs (create_time, content) VALUES (%s, %s)"
-            values = (datetime.datetime.now(), log_content)
-            DatabaseManager.execute_query(query, values)
-        except Exception as e:
-            print(f"Error logging to activity_logs: {str(e)}")
-    
-    # Skip webhook if no URL configured
-    if not webhook_url:
-        return
-    
-    # Send webhook asynchronously
-    def send_webhook():
+        log_content = json.dumps({
+            "status": status_info["title"],
+            "message": embed_message,
+            "non_embed_message": non_embed_message,
+            "is_ticket": is_ticket,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+
+    # Deliver the database insert and webhook post off the caller's thread so
+    # logging never blocks a request
+    def deliver_log():
+        if log_content is not None:
+            try:
+                # Insert into activity_logs table
+                query = "INSERT INTO activity_logs (create_time, content) VALUES (%s, %s)"
+                values = (datetime.datetime.now(), log_content)
+                DatabaseManager.execute_query(query, values)
+            except Exception as e:
+                print(f"Error logging to activity_logs: {str(e)}")
+
+        # Skip webhook if no URL configured
+        if not webhook_url:
+            return
         try:
             requests.post(webhook_url, json=payload, timeout=60)
         except Exception as e:
             print(f"Error sending webhook: {str(e)}")
-    
-    # Start thread to send webhook
-    threading.Thread(target=send_webhook).start()
+
+    # Nothing to deliver
+    if log_content is None and not webhook_url:
+        return
+
+    # Start thread to deliver the log
+    threading.Thread(target=deliver_log).start()
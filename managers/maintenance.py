@@ -17,19 +17,15 @@ import requests
 import bcrypt
 import secrets
 from flask import current_app
-from config import PTERODACTYL_URL, PTERODACTYL_ADMIN_KEY
+from config import PTERODACTYL_URL
 from managers.database_manager import DatabaseManager
 from .logging import webhook_log
 from .user_manager import get_ptero_id, update_last_seen
 from .email_manager import send_email
 from security import safe_requests
 
-# API authentication headers
-HEADERS = {
-    "Authorization": f"Bearer {PTERODACTYL_ADMIN_KEY}",
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-}
+# API authentication headers (shared template built once in managers.utils)
+from .utils import HEADERS
 
 def sync_users_script():
     """
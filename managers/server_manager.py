@@ -16,7 +16,7 @@ to manage game servers across the system.
 import requests
 import json
 import threading
-from config import PTERODACTYL_URL, PTERODACTYL_ADMIN_KEY, AUTODEPLOY_NEST_ID, PTERODACTYL_CLIENT_KEY
+from config import PTERODACTYL_URL, AUTODEPLOY_NEST_ID, PTERODACTYL_CLIENT_KEY
 from pterocache import PteroCache
 from managers.database_manager import DatabaseManager
 from .logging import webhook_log
@@ -27,12 +27,8 @@ import secrets
 # Initialize cache
 cache = PteroCache()
 
-# API authentication headers
-HEADERS = {
-    "Authorization": f"Bearer {PTERODACTYL_ADMIN_KEY}",
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-}
+# API authentication headers (shared template built once in managers.utils)
+from .utils import HEADERS
 
 def get_nodes(all: bool = False) -> list[dict]:
     """
@@ -16,16 +16,12 @@ import bcrypt
 import requests
 import threading
 import datetime
-from config import PTERODACTYL_URL, PTERODACTYL_ADMIN_KEY
+from config import PTERODACTYL_URL
 from managers.database_manager import DatabaseManager
 from .logging import webhook_log
 
-# API authentication headers
-HEADERS = {
-    "Authorization": f"Bearer {PTERODACTYL_ADMIN_KEY}",
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-}
+# API authentication headers (shared template built once in managers.utils)
+from .utils import HEADERS
 
 def get_ptero_id(email: str):
     """